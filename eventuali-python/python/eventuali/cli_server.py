@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Eventuali CLI server - run CLI commands in a long-lived process.
+
+Reads one JSON request per line on stdin, ``{"argv": ["eventuali", "init", ...]}``,
+dispatches it into the regular click entrypoint in-process and writes one JSON
+response per line on stdout, ``{"rc": 0, "stdout": "...", "stderr": "..."}``.
+Callers that run many commands pay interpreter and environment start-up once
+instead of once per command.
+"""
+
+import io
+import json
+import sys
+from contextlib import redirect_stderr, redirect_stdout
+from typing import Any, Dict, List, Optional, TextIO
+
+import click
+
+from .cli import main as cli_main
+
+
+def run_command(argv: List[str]) -> Dict[str, Any]:
+    """Run one CLI invocation and return its exit code and captured output."""
+    if argv and argv[0] == "eventuali":
+        argv = argv[1:]
+
+    out, err = io.StringIO(), io.StringIO()
+    rc = 0
+    with redirect_stdout(out), redirect_stderr(err):
+        try:
+            result = cli_main.main(
+                args=argv, prog_name="eventuali", standalone_mode=False
+            )
+            if isinstance(result, int):
+                rc = result
+        except click.ClickException as e:
+            e.show(file=err)
+            rc = e.exit_code
+        except click.exceptions.Exit as e:
+            rc = e.exit_code
+        except click.Abort:
+            err.write("Aborted!\n")
+            rc = 1
+        except SystemExit as e:
+            if e.code is None:
+                rc = 0
+            elif isinstance(e.code, int):
+                rc = e.code
+            else:
+                err.write(f"{e.code}\n")
+                rc = 1
+        except Exception as e:
+            err.write(f"{type(e).__name__}: {e}\n")
+            rc = 1
+
+    return {"rc": rc, "stdout": out.getvalue(), "stderr": err.getvalue()}
+
+
+def serve(stdin: Optional[TextIO] = None, stdout: Optional[TextIO] = None) -> None:
+    """Answer JSON-line requests until stdin is closed."""
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+
+    for line in stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            request = json.loads(line)
+            response = run_command(list(request["argv"]))
+        except (ValueError, KeyError, TypeError) as e:
+            response = {
+                "rc": 2,
+                "stdout": "",
+                "stderr": f"Invalid request: {e}\n",
+            }
+        stdout.write(json.dumps(response) + "\n")
+        stdout.flush()
+
+
+if __name__ == '__main__':
+    serve()
@@ -0,0 +1,61 @@
+"""
+Tests for the JSON-line CLI server.
+"""
+
+import io
+import json
+
+from eventuali.cli_server import run_command, serve
+
+
+class TestCliServer:
+    """Test in-process CLI dispatch and the request/response framing."""
+
+    def test_help(self):
+        """Test that --help succeeds and captures the usage text."""
+        result = run_command(["eventuali", "--help"])
+
+        assert result["rc"] == 0
+        assert "Usage:" in result["stdout"]
+        assert "init" in result["stdout"]
+
+    def test_unknown_command(self):
+        """Test that an unknown command reports a usage error."""
+        result = run_command(["not-a-command"])
+
+        assert result["rc"] == 2
+        assert "No such command" in result["stderr"]
+        assert result["stdout"] == ""
+
+    def test_serve_round_trip(self):
+        """Test one response line per request, skipping blank lines."""
+        requests = "\n".join([
+            json.dumps({"argv": ["eventuali", "--version"]}),
+            "",
+            json.dumps({"argv": ["--help"]}),
+        ]) + "\n"
+        stdout = io.StringIO()
+
+        serve(io.StringIO(requests), stdout)
+
+        responses = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        assert [r["rc"] for r in responses] == [0, 0]
+        assert "0.2.0" in responses[0]["stdout"]
+
+    def test_serve_malformed_request(self):
+        """Test that malformed requests get an error response and serving continues."""
+        requests = "\n".join([
+            "not json",
+            json.dumps({"args": []}),
+            json.dumps({"argv": ["--help"]}),
+        ]) + "\n"
+        stdout = io.StringIO()
+
+        serve(io.StringIO(requests), stdout)
+
+        responses = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        assert len(responses) == 3
+        assert responses[0]["rc"] == 2
+        assert "Invalid request" in responses[0]["stderr"]
+        assert responses[1]["rc"] == 2
+        assert responses[2]["rc"] == 0
@@ -14,39 +14,147 @@ This example demonstrates enterprise-grade event sourcing features:
 import asyncio
 import sys
 import os
-from typing import ClassVar, Optional, Dict, List, Any, Union, Set
+from typing import Awaitable, Callable, ClassVar, Deque, Optional, Dict, List, Any, Union, Set, Tuple
 from datetime import datetime, timezone, timedelta
-from enum import Enum
-from dataclasses import dataclass, field
+from enum import Enum, IntEnum, IntFlag
+from dataclasses import asdict, dataclass, field
 from abc import ABC, abstractmethod
+from array import array
 import json
+import logging
+import re
 import uuid
 import time
 import hashlib
+import heapq
 import hmac
+import queue
 import secrets
-from collections import defaultdict, deque
+import threading
+from collections import Counter, OrderedDict, defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from itertools import chain
+
+try:
+    import orjson
+except ImportError:
+    # orjson is optional; audit file records and reports fall back to the json module
+    orjson = None
 
 # Add the python package to the path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'eventuali-python', 'python'))
 
 from eventuali import EventStore
-from eventuali.aggregate import User
+from eventuali.aggregate import Aggregate, User
 from eventuali.event import UserRegistered, Event
 
+logger = logging.getLogger(__name__)
+
+_DAY_SECONDS = 86400
+
+# dataclass(slots=True) needs Python 3.10; older interpreters get regular dataclasses
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# Set by _time_scope so every _now() within one operation shares a single clock read
+_SCOPED_NOW: ContextVar[Optional[float]] = ContextVar("_SCOPED_NOW", default=None)
+
+def _now() -> float:
+    """Current time as epoch seconds; stored timestamps use this representation."""
+    scoped = _SCOPED_NOW.get()
+    return scoped if scoped is not None else time.time()
+
+@contextmanager
+def _time_scope():
+    """Pin _now() to one timestamp for the duration of an operation."""
+    outer = _SCOPED_NOW.get()
+    if outer is not None:
+        yield outer  # nested operations share the outermost scope's time
+        return
+    now = time.time()
+    token = _SCOPED_NOW.set(now)
+    try:
+        yield now
+    finally:
+        _SCOPED_NOW.reset(token)
+
+def _time_scoped(method):
+    """Run a method inside a _time_scope."""
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        with _time_scope():
+            return method(*args, **kwargs)
+    return wrapper
+
+def _format_ts(ts: Optional[float]) -> Optional[str]:
+    """Format an epoch-seconds timestamp as ISO-8601 for output."""
+    return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat() if ts is not None else None
+
+# Float tokens that repr() and orjson write differently, matched outside JSON strings:
+# orjson prints 1e-05 as 0.00001, 1e-07 as 1e-7, and non-finite values as null
+_REPORT_FLOAT_TOKENS = re.compile(r'"(?:[^"\\]|\\.)*"|(-?)(\d)(?:\.(\d+))?e-0([5-9])|-?Infinity|NaN')
+
+def _orjson_float(match: "re.Match[str]") -> str:
+    """Rewrite one matched token the way orjson writes it; strings pass through."""
+    token = match.group(0)
+    if token.startswith('"'):
+        return token
+    sign, lead, frac, exponent = match.groups()
+    if lead is None:
+        return "null"
+    if exponent == "5":
+        return f"{sign}0.0000{lead}{frac or ''}"
+    return token.replace("e-0", "e-")
+
+def _report_default(obj: Any) -> Any:
+    """Encode the non-JSON types reports may carry the way orjson encodes them."""
+    if isinstance(obj, datetime):
+        if obj.tzinfo is None:
+            obj = obj.replace(tzinfo=timezone.utc)  # OPT_NAIVE_UTC
+        text = obj.isoformat()
+        return text[:-6] + "Z" if obj.utcoffset() == timedelta(0) else text  # OPT_UTC_Z
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+def dumps_report(report: Dict[str, Any]) -> bytes:
+    """Serialize a report dict to compact JSON bytes; both paths emit the same bytes."""
+    if orjson is not None:
+        return orjson.dumps(report, option=orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z)
+    text = json.dumps(report, default=_report_default, separators=(",", ":"), ensure_ascii=False)
+    return _REPORT_FLOAT_TOKENS.sub(_orjson_float, text).encode()
+
 # Security and Access Control
-class SecurityLevel(Enum):
-    PUBLIC = "public"
-    INTERNAL = "internal"
-    CONFIDENTIAL = "confidential"
-    RESTRICTED = "restricted"
+class SecurityLevel(IntEnum):
+    PUBLIC = 0
+    INTERNAL = 1
+    CONFIDENTIAL = 2
+    RESTRICTED = 3
+    
+    @property
+    def label(self) -> str:
+        """Lowercase name used in policies and output."""
+        return self.name.lower()
+    
+    @classmethod
+    def parse(cls, value: Union["SecurityLevel", str]) -> "SecurityLevel":
+        """Accept a SecurityLevel or its lowercase label."""
+        return value if isinstance(value, cls) else cls[value.upper()]
 
-class Permission(Enum):
-    READ = "read"
-    WRITE = "write"
-    DELETE = "delete"
-    ADMIN = "admin"
-    AUDIT = "audit"
+class Permission(IntFlag):
+    READ = 1
+    WRITE = 2
+    DELETE = 4
+    ADMIN = 8
+    AUDIT = 16
+    
+    @property
+    def label(self) -> str:
+        """Lowercase name of a single permission."""
+        return self.name.lower()
 
 @dataclass
 class SecurityPrincipal:
@@ -54,18 +162,47 @@ class SecurityPrincipal:
     principal_id: str
     principal_type: str  # "user", "service", "system"
     roles: Set[str] = field(default_factory=set)
-    permissions: Set[Permission] = field(default_factory=set)
+    permissions: Permission = Permission(0)  # bitmask of granted permissions
     security_clearance: SecurityLevel = SecurityLevel.PUBLIC
     created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
     last_login: Optional[datetime] = None
     is_active: bool = True
+    
+    # RBAC mask and the (permissions, clearance) it was computed from
+    _authz_mask: int = field(default=0, init=False, repr=False, compare=False)
+    _authz_key: Optional[Tuple[int, int]] = field(default=None, init=False, repr=False, compare=False)
+
+# RBAC masks hold permission bits in the low word and clearance bits above
+# _CLEARANCE_SHIFT. A principal sets every clearance bit up to its own level while
+# a resource sets only the bit of its required level, so one AND-compare checks both.
+_CLEARANCE_SHIFT = 32
+_ALL_PERMISSIONS = int(Permission.READ | Permission.WRITE | Permission.DELETE
+                       | Permission.ADMIN | Permission.AUDIT)
+
+def principal_mask(permissions: Permission, clearance: SecurityLevel) -> int:
+    """RBAC mask granted to a principal; admins hold every permission bit."""
+    permission_bits = _ALL_PERMISSIONS if permissions & Permission.ADMIN else int(permissions)
+    return permission_bits | (((1 << (int(clearance) + 1)) - 1) << _CLEARANCE_SHIFT)
+
+def resource_mask(required_clearance: SecurityLevel) -> int:
+    """RBAC mask a resource policy requires."""
+    return 1 << (int(required_clearance) + _CLEARANCE_SHIFT)
+
+# Policy clearance label -> resource mask, so policy lookups stay a dict hit
+_CLEARANCE_MASKS: Dict[str, int] = {level.label: resource_mask(level) for level in SecurityLevel}
+
+def policy_mask(policy: Dict[str, Any]) -> int:
+    """RBAC mask required by an access policy entry."""
+    clearance = policy.get("required_clearance", "public")
+    mask = _CLEARANCE_MASKS.get(clearance)
+    return mask if mask is not None else resource_mask(SecurityLevel.parse(clearance))
 
 class SecurityEvent(Event):
     """Base security event."""
     principal_id: str
     action: str
     resource: str
-    timestamp: str
+    timestamp: str  # ISO-8601; the event store parses it as RFC 3339
     ip_address: Optional[str] = None
     user_agent: Optional[str] = None
     success: bool = True
@@ -76,6 +213,7 @@ class AccessControlEvent(SecurityEvent):
     permission_required: str
     permission_granted: bool
     reason: Optional[str] = None
+    coalesced_count: int = 1
 
 class AuditEvent(SecurityEvent):
     """Audit trail event."""
@@ -91,23 +229,324 @@ class DataAccessEvent(SecurityEvent):
     access_pattern: str = "read"  # read, write, delete, export
     data_size_bytes: int = 0
 
+# In-process security records. The rings hold these lightweight slotted records;
+# they become pydantic events only when persisted to the event store.
+@dataclass(**_DATACLASS_SLOTS)
+class SecurityRecord:
+    """Security event as kept in memory."""
+    principal_id: str
+    action: str
+    resource: str
+    timestamp: float  # epoch seconds
+    ip_address: Optional[str] = None
+    user_agent: Optional[str] = None
+    success: bool = True
+    risk_score: float = 0.0
+    
+    EVENT_CLASS: ClassVar[type] = SecurityEvent
+    
+    def to_event(self) -> SecurityEvent:
+        """Translate into the persistable event."""
+        fields = asdict(self)
+        fields["timestamp"] = datetime.fromtimestamp(self.timestamp, tz=timezone.utc).isoformat()
+        return self.EVENT_CLASS(**fields)
+
+@dataclass(**_DATACLASS_SLOTS)
+class AccessControlRecord(SecurityRecord):
+    """Access control event as kept in memory."""
+    permission_required: str = ""
+    permission_granted: bool = False
+    reason: Optional[str] = None
+    coalesced_count: int = 1
+    
+    EVENT_CLASS: ClassVar[type] = AccessControlEvent
+
+@dataclass(**_DATACLASS_SLOTS)
+class DataAccessRecord(SecurityRecord):
+    """Data access event as kept in memory."""
+    data_type: str = ""
+    record_ids: List[str] = field(default_factory=list)
+    access_pattern: str = "read"
+    data_size_bytes: int = 0
+    
+    EVENT_CLASS: ClassVar[type] = DataAccessEvent
+
+class SecurityAuditTrail(Aggregate):
+    """Aggregate that persisted security events are recorded against."""
+    events_recorded: int = 0
+    
+    def apply_security_event(self, event: SecurityEvent) -> None:
+        self.events_recorded += 1
+    
+    def apply_access_control_event(self, event: AccessControlEvent) -> None:
+        self.events_recorded += 1
+    
+    def apply_data_access_event(self, event: DataAccessEvent) -> None:
+        self.events_recorded += 1
+
+class AuditFileSink:
+    """Append-only JSONL audit file written one batch per writev call."""
+    
+    def __init__(self, path: str, durable: bool = False):
+        flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT
+        if durable:
+            flags |= getattr(os, "O_DSYNC", 0)  # each write reaches stable storage
+        self.path = path
+        self._fd = os.open(path, flags, 0o600)
+        try:
+            self._iov_max = os.sysconf("SC_IOV_MAX")
+        except (AttributeError, ValueError, OSError):
+            self._iov_max = 1024
+    
+    @staticmethod
+    def _encode(record: SecurityRecord) -> bytes:
+        """Encode a record as one JSON line."""
+        if orjson is not None:
+            return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+        return (json.dumps(asdict(record), separators=(",", ":"), ensure_ascii=False) + "\n").encode()
+    
+    def write_batch(self, records: List[SecurityRecord]):
+        """Write a batch of records, one iovec per record."""
+        buffers = [self._encode(record) for record in records]
+        if not hasattr(os, "writev"):
+            self._write_all(b"".join(buffers))
+            return
+        for start in range(0, len(buffers), self._iov_max):
+            chunk = buffers[start:start + self._iov_max]
+            written = os.writev(self._fd, chunk)
+            if written < sum(len(b) for b in chunk):
+                self._write_all(b"".join(chunk)[written:])  # finish a short write
+    
+    def _write_all(self, data: bytes):
+        """Write data in full, retrying after short writes."""
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self._fd, view):]
+    
+    def close(self):
+        """Close the audit file."""
+        os.close(self._fd)
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into a single execution."""
+    
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._callers: Dict[str, int] = {}
+    
+    def callers(self, key: str) -> int:
+        """Number of callers currently sharing the flight for key."""
+        return self._callers.get(key, 0)
+    
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn once per key; concurrent callers await the same result."""
+        future = self._inflight.get(key)
+        if future is not None:
+            self._callers[key] += 1
+            return await future
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self._callers[key] = 1
+        try:
+            # Yield once so callers issued in the same burst can join this flight
+            await asyncio.sleep(0)
+            result = await fn()
+            future.set_result(result)
+            return result
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()  # mark retrieved when nobody else is waiting
+            raise
+        finally:
+            del self._inflight[key]
+            del self._callers[key]
+
 class SecurityManager:
     """Enterprise security manager."""
     
-    def __init__(self):
+    PBKDF2_ITERATIONS = 200_000
+    VERIFY_CACHE_SIZE = 4096
+    AUTHZ_CACHE_SIZE = 10_000
+    
+    _STOP_WRITER = object()  # queue sentinel that ends the writer thread
+    
+    def __init__(self, max_events: int = 100_000, max_batch_size: int = 1024,
+                 max_flush_delay_ms: float = 5.0, audit_sink: Optional[AuditFileSink] = None):
         self.principals: Dict[str, SecurityPrincipal] = {}
         self.access_policies: Dict[str, Dict[str, Any]] = {}
-        self.security_events: List[SecurityEvent] = []
-        self.failed_attempts: Dict[str, List[datetime]] = defaultdict(list)
+        self.max_events = max_events
+        # Auth failures and high-risk events get a reserved ring so a burst of
+        # routine traffic cannot evict them.
+        self._events_normal: Deque[SecurityRecord] = deque(maxlen=int(max_events * 0.95))
+        self._events_hipri: Deque[SecurityRecord] = deque(maxlen=max(2000, int(max_events * 0.05)))
+        self._unpersisted: Deque[SecurityRecord] = deque(maxlen=max_events)  # awaiting flush_to_event_store
+        self.unpersisted_dropped = 0  # evicted from _unpersisted before they were saved
+        self.failed_attempts: Dict[str, Deque[float]] = defaultdict(
+            lambda: deque(maxlen=self.max_failed_attempts)
+        )  # monotonic timestamps of the most recent failures
+        self._locked_until: Dict[str, float] = {}  # principal_id -> lockout expiry (epoch seconds)
         self.encryption_keys: Dict[str, str] = {}
         
+        # principal_id -> (salt, PBKDF2 hash of the password)
+        self._password_hashes: Dict[str, Tuple[bytes, bytes]] = {}
+        # LRU of KDF results keyed by an HMAC of (principal_id, password) under a
+        # per-process secret, so no reusable password hash is held; cleared on password change
+        self._verify_cache_secret = secrets.token_bytes(32)
+        self._verify_cache: "OrderedDict[bytes, bool]" = OrderedDict()
+        
         # Security thresholds
         self.max_failed_attempts = 5
         self.lockout_duration = timedelta(minutes=30)
         self.session_timeout = timedelta(hours=8)
+        
+        # Authorization coalescing for authorize_async
+        self.authz_cache_ttl = 2.0  # seconds
+        # key -> (granted, monotonic expiry, principal/policy state the decision used)
+        self._authz_cache: Dict[str, Tuple[bool, float, Tuple[int, int, Optional[str]]]] = {}
+        self._singleflight = SingleFlight()
+        
+        # Producers only enqueue; a background writer persists events in batches
+        self.max_batch_size = max_batch_size
+        self.max_flush_delay_ms = max_flush_delay_ms
+        self._event_q: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._events_lock = threading.Lock()
+        self.audit_sink = audit_sink
+        self._writer = threading.Thread(target=self._flush_loop, name="security-event-writer",
+                                        daemon=True)
+        self._writer.start()
+    
+    @property
+    def security_events(self) -> List[SecurityRecord]:
+        """All retained security events, normal and high-priority."""
+        self.flush()
+        with self._events_lock:
+            return list(chain(self._events_normal, self._events_hipri))
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every event enqueued so far has been persisted.
+        
+        Returns False if timeout expires first. Once the writer has stopped,
+        pending events are persisted in the calling thread instead.
+        """
+        if not self._writer.is_alive():
+            self._drain()
+            return True
+        done = threading.Event()
+        self._event_q.put(done)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not done.wait(0.1):
+            if not self._writer.is_alive():
+                self._drain()
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+        return True
+    
+    async def flush_async(self, timeout: Optional[float] = None) -> bool:
+        """Flush without blocking the event loop."""
+        return await asyncio.get_running_loop().run_in_executor(None, self.flush, timeout)
+    
+    def close(self):
+        """Persist pending events and stop the writer thread."""
+        if self._writer.is_alive():
+            self._event_q.put(self._STOP_WRITER)
+            self._writer.join()
+        self._drain()
+    
+    def _flush_loop(self):
+        """Drain the event queue in batches of up to max_batch_size."""
+        q = self._event_q
+        stopping = False
+        while not stopping:
+            batch = [q.get()]
+            deadline = time.monotonic() + self.max_flush_delay_ms / 1000
+            while len(batch) < self.max_batch_size and batch[-1] is not self._STOP_WRITER:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(q.get(timeout=remaining) if remaining > 0 else q.get_nowait())
+                except queue.Empty:
+                    break
+                if isinstance(batch[-1], threading.Event):
+                    break  # a flush is waiting; persist now
+            if batch[-1] is self._STOP_WRITER:
+                batch.pop()
+                stopping = True
+            self._persist_logged(batch)
+    
+    def _drain(self):
+        """Persist whatever is still queued, in the calling thread."""
+        batch = []
+        while True:
+            try:
+                item = self._event_q.get_nowait()
+            except queue.Empty:
+                break
+            if item is not self._STOP_WRITER:
+                batch.append(item)
+        if batch:
+            self._persist_logged(batch)
+    
+    def _persist_logged(self, batch: List[Any]):
+        """Persist a batch, logging failures so one bad batch cannot stall later flushes."""
+        try:
+            self._persist(batch)
+        except Exception:
+            logger.exception("Failed to persist %d security events", len(batch))
+    
+    def _persist(self, batch: List[Any]):
+        """Append a batch to the rings under a single lock acquisition."""
+        waiters = [event for event in batch if isinstance(event, threading.Event)]
+        try:
+            records = [event for event in batch if not isinstance(event, threading.Event)]
+            with self._events_lock:
+                dropped = max(0, len(self._unpersisted) + len(records) - self.max_events)
+                if dropped:
+                    self.unpersisted_dropped += dropped
+                    logger.warning("Dropped %d security events not yet saved to the event store; "
+                                   "call flush_to_event_store more often", dropped)
+                for event in records:
+                    self._unpersisted.append(event)
+                    if event.risk_score > 2.0 or (event.action == "authentication" and not event.success):
+                        # Auth failures and high-risk events go to the reserved ring
+                        self._events_hipri.append(event)
+                    else:
+                        self._events_normal.append(event)
+            if self.audit_sink is not None and records:
+                self.audit_sink.write_batch(records)
+        finally:
+            for waiter in waiters:
+                waiter.set()
+    
+    async def flush_to_event_store(self, event_store: EventStore, trail: SecurityAuditTrail) -> int:
+        """Persist records not yet stored as events on the audit trail aggregate."""
+        await self.flush_async()
+        with self._events_lock:
+            records = list(self._unpersisted)
+        
+        pending = len(trail.uncommitted_events)
+        try:
+            for record in records:
+                trail.apply(record.to_event())
+            await event_store.save(trail)
+        except Exception:
+            # Unstage the events so a retry applies each record exactly once
+            applied = len(trail.uncommitted_events) - pending
+            del trail.uncommitted_events[pending:]
+            trail.version -= applied
+            trail.events_recorded -= applied
+            raise
+        
+        # Only now forget the saved records; newer ones stay queued behind them
+        saved = {id(record) for record in records}
+        with self._events_lock:
+            while self._unpersisted and id(self._unpersisted[0]) in saved:
+                self._unpersisted.popleft()
+        return len(records)
     
     def create_principal(self, principal_id: str, principal_type: str, 
-                        roles: Set[str] = None, clearance: SecurityLevel = SecurityLevel.PUBLIC) -> SecurityPrincipal:
+                        roles: Set[str] = None, clearance: SecurityLevel = SecurityLevel.PUBLIC,
+                        password: Optional[str] = None) -> SecurityPrincipal:
         """Create security principal."""
         principal = SecurityPrincipal(
             principal_id=principal_id,
@@ -118,15 +557,25 @@ class SecurityManager:
         
         # Grant default permissions based on roles
         if "admin" in principal.roles:
-            principal.permissions.update([Permission.READ, Permission.WRITE, Permission.DELETE, Permission.ADMIN])
+            principal.permissions |= Permission.READ | Permission.WRITE | Permission.DELETE | Permission.ADMIN
         elif "auditor" in principal.roles:
-            principal.permissions.update([Permission.READ, Permission.AUDIT])
+            principal.permissions |= Permission.READ | Permission.AUDIT
         else:
-            principal.permissions.add(Permission.READ)
+            principal.permissions |= Permission.READ
         
         self.principals[principal_id] = principal
+        if password is not None:
+            self.set_password(principal_id, password)
         return principal
     
+    def set_password(self, principal_id: str, password: str):
+        """Store a salted PBKDF2 hash of the principal's password."""
+        salt = secrets.token_bytes(16)
+        self._password_hashes[principal_id] = (
+            salt, hashlib.pbkdf2_hmac("sha256", password.encode(), salt, self.PBKDF2_ITERATIONS))
+        self._verify_cache.clear()
+    
+    @_time_scoped
     def authenticate(self, principal_id: str, credentials: str, ip_address: str = None) -> bool:
         """Authenticate principal."""
         if principal_id not in self.principals:
@@ -142,8 +591,7 @@ class SecurityManager:
                                        "Account locked", ip_address)
             return False
         
-        # Simulate credential verification (in real implementation, use proper hashing)
-        success = self._verify_credentials(credentials)
+        success = self._verify_credentials(principal_id, credentials)
         
         if success:
             principal.last_login = datetime.now(timezone.utc)
@@ -163,125 +611,197 @@ class SecurityManager:
         if principal_id not in self.principals:
             return False
         
-        principal = self.principals[principal_id]
+        has_permission = self._compute_authorize(principal_id, resource, permission)
+        self._record_access_event(principal_id, resource, permission, has_permission)
+        return has_permission
+    
+    async def authorize_async(self, principal_id: str, resource: str, permission: Permission) -> bool:
+        """Authorize access, coalescing concurrent identical checks."""
+        if principal_id not in self.principals:
+            return False
         
-        # Check if principal has required permission
-        has_permission = permission in principal.permissions
+        key = f"{principal_id}:{resource}:{permission.label}"
+        cached = self._authz_cache.get(key)
+        if cached is not None:
+            granted, expires, state = cached
+            if expires > time.monotonic() and state == self._authz_state(principal_id, resource):
+                self._record_access_event(principal_id, resource, permission, granted,
+                                          reason="Cached policy decision")
+                return granted
+            del self._authz_cache[key]
         
-        # Check role-based access
-        if not has_permission and "admin" in principal.roles:
-            has_permission = True
+        async def evaluate() -> bool:
+            has_permission = self._compute_authorize(principal_id, resource, permission)
+            self._cache_authz(key, has_permission, self._authz_state(principal_id, resource))
+            self._record_access_event(principal_id, resource, permission, has_permission,
+                                      coalesced_count=self._singleflight.callers(key))
+            return has_permission
         
-        # Check resource-specific policies
-        if resource in self.access_policies:
-            policy = self.access_policies[resource]
-            required_clearance = SecurityLevel(policy.get("required_clearance", "public"))
-            
-            if principal.security_clearance.value != required_clearance.value:
-                # Compare security levels (simplified)
-                clearance_levels = ["public", "internal", "confidential", "restricted"]
-                principal_level = clearance_levels.index(principal.security_clearance.value)
-                required_level = clearance_levels.index(required_clearance.value)
-                
-                if principal_level < required_level:
-                    has_permission = False
+        return await self._singleflight.do(key, evaluate)
+    
+    def _authz_state(self, principal_id: str, resource: str) -> Tuple[int, int, Optional[str]]:
+        """Inputs of an authorization decision; a cached decision is valid while they match."""
+        principal = self.principals[principal_id]
+        policy = self.access_policies.get(resource)
+        return (int(principal.permissions), int(principal.security_clearance),
+                None if policy is None else policy.get("required_clearance", "public"))
+    
+    def _cache_authz(self, key: str, granted: bool, state: Tuple[int, int, Optional[str]]):
+        """Cache a decision, evicting expired entries once the cache is full."""
+        cache = self._authz_cache
+        if len(cache) >= self.AUTHZ_CACHE_SIZE:
+            now = time.monotonic()
+            for stale in [k for k, (_, expires, _) in cache.items() if expires <= now]:
+                del cache[stale]
+            if len(cache) >= self.AUTHZ_CACHE_SIZE:
+                del cache[next(iter(cache))]  # still full: drop the oldest entry
+        cache[key] = (granted, time.monotonic() + self.authz_cache_ttl, state)
+    
+    def _compute_authorize(self, principal_id: str, resource: str, permission: Permission) -> bool:
+        """Evaluate permissions, roles and resource policy for a principal."""
+        principal = self.principals[principal_id]
         
-        # Record access control event
-        event = AccessControlEvent(
+        # Recompute the principal's mask only when its permissions or clearance change
+        key = (int(principal.permissions), int(principal.security_clearance))
+        if principal._authz_key != key:
+            principal._authz_mask = principal_mask(principal.permissions, principal.security_clearance)
+            principal._authz_key = key
+        
+        # Policies are read on every call so edits to access_policies apply immediately
+        policy = self.access_policies.get(resource)
+        required = int(permission) if policy is None else policy_mask(policy) | int(permission)
+        return principal._authz_mask & required == required
+    
+    def set_access_policy(self, resource: str, required_clearance: SecurityLevel):
+        """Register the clearance required to access a resource."""
+        self.access_policies[resource] = {"required_clearance": required_clearance.label}
+        self._authz_cache.clear()
+    
+    def _record_access_event(self, principal_id: str, resource: str, permission: Permission,
+                             has_permission: bool, coalesced_count: int = 1,
+                             reason: str = "Policy evaluation completed"):
+        """Record access control event."""
+        event = AccessControlRecord(
             principal_id=principal_id,
             action="authorize",
             resource=resource,
-            timestamp=datetime.now(timezone.utc).isoformat(),
-            permission_required=permission.value,
+            timestamp=_now(),
+            permission_required=permission.label,
             permission_granted=has_permission,
-            reason="Policy evaluation completed"
+            reason=reason,
+            coalesced_count=coalesced_count
         )
         
-        self.security_events.append(event)
-        return has_permission
+        self._event_q.put(event)
     
     def track_data_access(self, principal_id: str, data_type: str, record_ids: List[str],
                          access_pattern: str = "read", data_size: int = 0):
         """Track data access for audit."""
-        event = DataAccessEvent(
+        event = DataAccessRecord(
             principal_id=principal_id,
             action="data_access",
             resource=data_type,
-            timestamp=datetime.now(timezone.utc).isoformat(),
+            timestamp=_now(),
             data_type=data_type,
             record_ids=record_ids,
             access_pattern=access_pattern,
             data_size_bytes=data_size
         )
         
-        self.security_events.append(event)
+        self._event_q.put(event)
     
-    def _verify_credentials(self, credentials: str) -> bool:
-        """Verify credentials (simplified)."""
-        # In real implementation, use proper password hashing
-        return len(credentials) >= 8
+    def _verify_credentials(self, principal_id: str, credentials: str) -> bool:
+        """Verify credentials against the stored password hash."""
+        if principal_id not in self._password_hashes:
+            return False  # no password on file
+        
+        tag = hmac.new(self._verify_cache_secret,
+                       f"{principal_id}\0{credentials}".encode(), hashlib.sha256).digest()
+        cached = self._verify_cache.get(tag)
+        if cached is not None:
+            self._verify_cache.move_to_end(tag)
+            return cached
+        
+        salt, expected = self._password_hashes[principal_id]
+        actual = hashlib.pbkdf2_hmac("sha256", credentials.encode(), salt, self.PBKDF2_ITERATIONS)
+        verified = hmac.compare_digest(actual, expected)
+        self._verify_cache[tag] = verified
+        if len(self._verify_cache) > self.VERIFY_CACHE_SIZE:
+            self._verify_cache.popitem(last=False)
+        return verified
     
     def _is_account_locked(self, principal_id: str) -> bool:
         """Check if account is locked."""
-        failed_attempts = self.failed_attempts.get(principal_id, [])
-        if len(failed_attempts) < self.max_failed_attempts:
-            return False
-        
-        # Check if lockout period has expired
-        last_attempt = max(failed_attempts)
-        return datetime.now(timezone.utc) - last_attempt < self.lockout_duration
+        return self._locked_until.get(principal_id, 0) > _now()
     
     def _record_failed_attempt(self, principal_id: str):
         """Record failed authentication attempt."""
-        now = datetime.now(timezone.utc)
-        self.failed_attempts[principal_id].append(now)
+        attempts = self.failed_attempts[principal_id]
+        attempts.append(time.monotonic())
         
-        # Keep only recent attempts
-        cutoff = now - self.lockout_duration
-        self.failed_attempts[principal_id] = [
-            attempt for attempt in self.failed_attempts[principal_id]
-            if attempt > cutoff
-        ]
+        # The deque holds the last N attempts; lock if the oldest is still in the window
+        lockout_seconds = self.lockout_duration.total_seconds()
+        if len(attempts) == attempts.maxlen and attempts[0] > time.monotonic() - lockout_seconds:
+            self._locked_until[principal_id] = _now() + lockout_seconds
     
     def _clear_failed_attempts(self, principal_id: str):
         """Clear failed attempts after successful login."""
         if principal_id in self.failed_attempts:
             del self.failed_attempts[principal_id]
+        self._locked_until.pop(principal_id, None)
     
     def _record_security_event(self, principal_id: str, action: str, resource: str, 
                              success: bool, reason: str = None, ip_address: str = None,
                              risk_score: float = 0.0):
         """Record security event."""
-        event = SecurityEvent(
+        event = SecurityRecord(
             principal_id=principal_id,
             action=action,
             resource=resource,
-            timestamp=datetime.now(timezone.utc).isoformat(),
+            timestamp=_now(),
             ip_address=ip_address,
             success=success,
             risk_score=risk_score
         )
         
-        self.security_events.append(event)
+        self._event_q.put(event)
     
     def get_security_report(self) -> Dict[str, Any]:
         """Generate security report."""
-        recent_events = [e for e in self.security_events 
-                        if datetime.fromisoformat(e.timestamp.replace('Z', '+00:00')) > 
-                           datetime.now(timezone.utc) - timedelta(hours=24)]
+        self.flush()
+        return self._build_security_report()
+    
+    async def get_security_report_async(self) -> Dict[str, Any]:
+        """Generate security report without blocking the event loop."""
+        await self.flush_async()
+        return self._build_security_report()
+    
+    @_time_scoped
+    def _build_security_report(self) -> Dict[str, Any]:
+        """Security report over the events persisted so far."""
+        now = _now()
+        cutoff = now - _DAY_SECONDS
+        with self._events_lock:
+            total_events = len(self._events_normal) + len(self._events_hipri)
+            recent_events = [e for e in chain(self._events_normal, self._events_hipri)
+                            if e.timestamp > cutoff]
         
         failed_logins = [e for e in recent_events if e.action == "authentication" and not e.success]
         successful_logins = [e for e in recent_events if e.action == "authentication" and e.success]
         
         return {
-            "total_events": len(self.security_events),
+            "total_events": total_events,
             "recent_events": len(recent_events),
             "successful_logins": len(successful_logins),
             "failed_logins": len(failed_logins),
             "active_principals": len([p for p in self.principals.values() if p.is_active]),
-            "locked_accounts": len([p for p in self.principals.keys() if self._is_account_locked(p)]),
+            "locked_accounts": sum(1 for t in self._locked_until.values() if t > now),
             "high_risk_events": len([e for e in recent_events if e.risk_score > 2.0])
         }
+    
+    def report_bytes(self) -> bytes:
+        """Security report serialized as JSON."""
+        return dumps_report(self.get_security_report())
 
 # Compliance and Regulatory Management
 class ComplianceStandard(Enum):
@@ -327,6 +847,15 @@ class ComplianceManager:
         self.data_inventory: Dict[str, Dict[str, Any]] = {}
         self.retention_policies: Dict[DataClassification, int] = {}
         
+        # Retention index: deletion-required rules by data type, and a min-heap of
+        # (expiry_epoch, data_id, rule_id) so only expired records are visited
+        self._rules_by_type: Dict[DataClassification, List[ComplianceRule]] = {}
+        self._expiry_heap: List[Tuple[float, str, str]] = []
+        self._expired: Dict[Tuple[str, str], float] = {}  # (data_id, rule_id) -> expiry
+        
+        # Reverse index for data subject requests: subject_id -> data_ids
+        self._subject_index: Dict[str, Set[str]] = defaultdict(set)
+        
         self._initialize_default_rules()
     
     def _initialize_default_rules(self):
@@ -357,63 +886,115 @@ class ComplianceManager:
         
         self.rules[gdpr_personal_data.rule_id] = gdpr_personal_data
         self.rules[sox_financial.rule_id] = sox_financial
+        self._rebuild_retention_index()
+    
+    def add_rule(self, rule: ComplianceRule):
+        """Add or replace a compliance rule."""
+        self.rules[rule.rule_id] = rule
+        self._rebuild_retention_index()
+    
+    def _rebuild_retention_index(self):
+        """Re-index rules by data type and recompute every record's expiry."""
+        self._rules_by_type = defaultdict(list)
+        for rule in self.rules.values():
+            if rule.deletion_required:
+                for data_type in rule.data_types:
+                    self._rules_by_type[data_type].append(rule)
+        
+        self._expiry_heap = []
+        self._expired = {}
+        for data_id, data_info in self.data_inventory.items():
+            self._index_expiry(data_id, data_info)
+    
+    def _index_expiry(self, data_id: str, data_info: Dict[str, Any]):
+        """Push a record's retention expiries onto the expiry heap."""
+        for rule in self._rules_by_type.get(data_info["data_type"], ()):
+            expiry = data_info["created_date"] + rule.retention_period_days * _DAY_SECONDS
+            heapq.heappush(self._expiry_heap, (expiry, data_id, rule.rule_id))
     
     def add_data_to_inventory(self, data_id: str, data_type: DataClassification,
-                            owner: str, created_date: datetime = None):
+                            owner: str, created_date: datetime = None,
+                            subject_id: Optional[str] = None):
         """Add data to compliance inventory."""
-        created_date = created_date or datetime.now(timezone.utc)
+        previous = self.data_inventory.get(data_id)
+        if (previous is not None and created_date is None and previous["data_type"] == data_type
+                and previous["owner"] == owner and previous["subject_id"] == subject_id):
+            return  # already tracked; skip re-tagging and re-indexing
+        
+        created_ts = created_date.timestamp() if created_date else _now()
+        if previous is not None:
+            # Re-ingest restarts retention; heap entries for the old copy go stale
+            self._forget_record(data_id, previous)
         
         self.data_inventory[data_id] = {
             "data_id": data_id,
             "data_type": data_type,
             "owner": owner,
-            "created_date": created_date.isoformat(),
+            "subject_id": subject_id,
+            "created_date": created_ts,
             "last_accessed": None,
             "retention_status": "active",
             "compliance_tags": self._get_compliance_tags(data_type)
         }
+        self._index_expiry(data_id, self.data_inventory[data_id])
+        if subject_id is not None:
+            self._subject_index[subject_id].add(data_id)
+    
+    def remove_data_from_inventory(self, data_id: str) -> bool:
+        """Remove a record; its expiry heap entries are discarded lazily."""
+        data_info = self.data_inventory.pop(data_id, None)
+        if data_info is None:
+            return False
+        self._forget_record(data_id, data_info)
+        return True
     
+    def _forget_record(self, data_id: str, data_info: Dict[str, Any]):
+        """Drop a record's expired entries and subject index membership."""
+        for rule in self._rules_by_type.get(data_info["data_type"], ()):
+            self._expired.pop((data_id, rule.rule_id), None)
+        if data_info["subject_id"] is not None:
+            self._subject_index[data_info["subject_id"]].discard(data_id)
+    
+    @_time_scoped
     def check_retention_compliance(self) -> List[Dict[str, Any]]:
         """Check data retention compliance."""
         violations = []
-        current_time = datetime.now(timezone.utc)
+        current_time = _now()
         
-        for data_id, data_info in self.data_inventory.items():
-            data_type = data_info["data_type"]
-            created_date = datetime.fromisoformat(data_info["created_date"])
-            
-            # Find applicable rules
-            applicable_rules = [rule for rule in self.rules.values() 
-                              if data_type in rule.data_types]
-            
-            for rule in applicable_rules:
-                retention_period = timedelta(days=rule.retention_period_days)
-                expiry_date = created_date + retention_period
-                
-                if current_time > expiry_date and rule.deletion_required:
-                    violations.append({
-                        "data_id": data_id,
-                        "rule_id": rule.rule_id,
-                        "violation_type": "retention_exceeded",
-                        "days_overdue": (current_time - expiry_date).days,
-                        "action_required": "delete",
-                        "compliance_standard": rule.standard.value
-                    })
+        # Move newly expired entries off the heap, skipping ones made stale by
+        # re-ingest or removal
+        heap = self._expiry_heap
+        while heap and heap[0][0] < current_time:
+            expiry_date, data_id, rule_id = heapq.heappop(heap)
+            data_info = self.data_inventory.get(data_id)
+            rule = self.rules.get(rule_id)
+            if data_info is None or rule is None:
+                continue
+            if data_info["created_date"] + rule.retention_period_days * _DAY_SECONDS == expiry_date:
+                self._expired[(data_id, rule_id)] = expiry_date
+        
+        for (data_id, rule_id), expiry_date in self._expired.items():
+            violations.append({
+                "data_id": data_id,
+                "rule_id": rule_id,
+                "violation_type": "retention_exceeded",
+                "days_overdue": int((current_time - expiry_date) // _DAY_SECONDS),
+                "action_required": "delete",
+                "compliance_standard": self.rules[rule_id].standard.value
+            })
         
         return violations
     
+    @_time_scoped
     def process_data_subject_request(self, subject_id: str, request_type: str) -> Dict[str, Any]:
         """Process data subject request (GDPR Article 17, etc.)."""
-        affected_data = [
-            data_id for data_id, data_info in self.data_inventory.items()
-            if data_info.get("subject_id") == subject_id or subject_id in str(data_info)
-        ]
+        affected_data = list(self._subject_index.get(subject_id, ()))
         
         if request_type == "deletion":
             # Mark for deletion
             for data_id in affected_data:
                 self.data_inventory[data_id]["retention_status"] = "deletion_requested"
-                self.data_inventory[data_id]["deletion_request_date"] = datetime.now(timezone.utc).isoformat()
+                self.data_inventory[data_id]["deletion_request_date"] = _now()
             
             # Record compliance event
             event = ComplianceEvent(
@@ -431,7 +1012,7 @@ class ComplianceManager:
             "request_type": request_type,
             "affected_records": len(affected_data),
             "status": "processed",
-            "completion_date": datetime.now(timezone.utc).isoformat()
+            "completion_date": _format_ts(_now())
         }
     
     def _get_compliance_tags(self, data_type: DataClassification) -> List[str]:
@@ -447,6 +1028,7 @@ class ComplianceManager:
         
         return tags
     
+    @_time_scoped
     def generate_compliance_report(self) -> Dict[str, Any]:
         """Generate comprehensive compliance report."""
         violations = self.check_retention_compliance()
@@ -469,8 +1051,12 @@ class ComplianceManager:
             "retention_violations": len(violations),
             "deletion_pending": len([d for d in self.data_inventory.values() 
                                    if d.get("retention_status") == "deletion_requested"]),
-            "report_generated": datetime.now(timezone.utc).isoformat()
+            "report_generated": _format_ts(_now())
         }
+    
+    def report_bytes(self) -> bytes:
+        """Compliance report serialized as JSON."""
+        return dumps_report(self.generate_compliance_report())
 
 # High Availability and Disaster Recovery
 class HAStatus(Enum):
@@ -496,7 +1082,19 @@ class DisasterRecoveryManager:
         self.nodes: Dict[str, HANode] = {}
         self.primary_node: Optional[str] = None
         self.backup_schedule: Dict[str, Any] = {}
+        self._latest_backup_ts: float = 0.0
+        self._latest_backup_id: Optional[str] = None
         self.recovery_procedures: Dict[str, List[str]] = {}
+        
+        # Running aggregates for get_ha_status; status changes go through _set_status
+        self._health_sum: float = 0.0
+        self._status_counts: Counter = Counter()
+        
+        # Failover candidates as (-health, insertion rank, node_id); entries are
+        # invalidated lazily, the rank keeps ties in node insertion order
+        self._secondary_heap: List[Tuple[float, int, str]] = []
+        self._node_rank: Dict[str, int] = {}
+        
         self.rto_target = 4  # Recovery Time Objective in hours
         self.rpo_target = 1  # Recovery Point Objective in hours
     
@@ -510,7 +1108,15 @@ class DisasterRecoveryManager:
             region=region
         )
         
+        replaced = self.nodes.get(node_id)
+        if replaced is not None:
+            self._health_sum -= replaced.health_score
+            self._status_counts[replaced.status] -= 1
         self.nodes[node_id] = node
+        self._node_rank.setdefault(node_id, len(self._node_rank))
+        self._health_sum += node.health_score
+        self._status_counts[node.status] += 1
+        self._push_candidate(node)
         
         if role == "primary" and self.primary_node is None:
             self.primary_node = node_id
@@ -521,31 +1127,61 @@ class DisasterRecoveryManager:
         """Update node health score."""
         if node_id in self.nodes:
             node = self.nodes[node_id]
+            self._health_sum += health_score - node.health_score
             node.health_score = health_score
             node.last_heartbeat = datetime.now(timezone.utc)
+            self._push_candidate(node)
             
             # Trigger failover if primary is unhealthy
             if node_id == self.primary_node and health_score < 20.0:
                 self._trigger_failover()
     
+    def _set_status(self, node: HANode, status: HAStatus):
+        """Change a node's status, keeping the status counts current."""
+        self._status_counts[node.status] -= 1
+        self._status_counts[status] += 1
+        node.status = status
+    
+    def _is_candidate(self, node: Optional[HANode]) -> bool:
+        """Whether a node can be promoted to primary."""
+        return node is not None and node.role == "secondary" and node.status == HAStatus.ACTIVE
+    
+    def _push_candidate(self, node: HANode):
+        """Record a secondary's current health in the failover heap."""
+        if not self._is_candidate(node):
+            return
+        heapq.heappush(self._secondary_heap,
+                       (-node.health_score, self._node_rank[node.node_id], node.node_id))
+        
+        # Stale entries pile up with every health update; rebuild once they dominate
+        if len(self._secondary_heap) > 4 * len(self.nodes) + 16:
+            self._secondary_heap = [(-n.health_score, self._node_rank[n.node_id], n.node_id)
+                                    for n in self.nodes.values() if self._is_candidate(n)]
+            heapq.heapify(self._secondary_heap)
+    
+    def _pop_best_secondary(self) -> Optional[HANode]:
+        """Pop the healthiest active secondary, discarding stale heap entries."""
+        heap = self._secondary_heap
+        while heap:
+            neg_health, _, node_id = heapq.heappop(heap)
+            node = self.nodes.get(node_id)
+            if self._is_candidate(node) and node.health_score == -neg_health:
+                return node
+        return None
+    
     def _trigger_failover(self) -> Optional[str]:
         """Trigger automatic failover."""
         if not self.primary_node:
             return None
         
-        # Find best secondary node
-        secondary_nodes = [n for n in self.nodes.values() 
-                          if n.role == "secondary" and n.status == HAStatus.ACTIVE]
-        
-        if not secondary_nodes:
-            return None
-        
         # Select secondary with highest health score
-        new_primary = max(secondary_nodes, key=lambda x: x.health_score)
+        new_primary = self._pop_best_secondary()
+        if new_primary is None:
+            return None
         
         # Perform failover
         old_primary = self.nodes[self.primary_node]
-        old_primary.status = HAStatus.FAILED
+        self._set_status(old_primary, HAStatus.FAILED)
         old_primary.role = "secondary"
         
         new_primary.role = "primary"
@@ -556,74 +1192,106 @@ class DisasterRecoveryManager:
     def create_backup(self, backup_type: str = "incremental") -> Dict[str, Any]:
         """Create backup."""
         backup_id = str(uuid.uuid4())
+        ts = _now()
         backup_info = {
             "backup_id": backup_id,
             "backup_type": backup_type,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": ts,
             "size_bytes": 1024 * 1024 * 100,  # Simulated 100MB
-            "checksum": hashlib.md5(backup_id.encode()).hexdigest(),
+            "checksum": hashlib.sha256(backup_id.encode()).hexdigest(),
             "status": "completed"
         }
         
         self.backup_schedule[backup_id] = backup_info
+        if ts > self._latest_backup_ts:
+            self._latest_backup_ts = ts
+            self._latest_backup_id = backup_id
         return backup_info
     
     def get_ha_status(self) -> Dict[str, Any]:
         """Get high availability status."""
-        active_nodes = [n for n in self.nodes.values() if n.status == HAStatus.ACTIVE]
-        failed_nodes = [n for n in self.nodes.values() if n.status == HAStatus.FAILED]
-        
         return {
             "primary_node": self.primary_node,
             "total_nodes": len(self.nodes),
-            "active_nodes": len(active_nodes),
-            "failed_nodes": len(failed_nodes),
-            "average_health": sum(n.health_score for n in self.nodes.values()) / len(self.nodes) if self.nodes else 0,
+            "active_nodes": self._status_counts[HAStatus.ACTIVE],
+            "failed_nodes": self._status_counts[HAStatus.FAILED],
+            "average_health": self._health_sum / len(self.nodes) if self.nodes else 0,
             "rto_target_hours": self.rto_target,
             "rpo_target_hours": self.rpo_target,
-            "last_backup": max(self.backup_schedule.values(), key=lambda x: x["timestamp"])["timestamp"] if self.backup_schedule else None
+            "last_backup": _format_ts(self._latest_backup_ts) if self._latest_backup_id else None
         }
 
 # Advanced Analytics and Business Intelligence
 class AnalyticsMetric:
     """Analytics metric definition."""
     
+    # aggregation -> reducer over the running (sum, count, min, max); unknown ones sum
+    _AGGREGATIONS: ClassVar[Dict[str, Callable[[float, int, float, float], float]]] = {
+        "sum": lambda total, count, lo, hi: total,
+        "count": lambda total, count, lo, hi: count,
+        "avg": lambda total, count, lo, hi: total / count,
+        "min": lambda total, count, lo, hi: lo,
+        "max": lambda total, count, lo, hi: hi,
+    }
+    
     def __init__(self, name: str, aggregation: str = "sum", dimension: str = None):
         self.name = name
         self.aggregation = aggregation  # sum, count, avg, min, max
         self.dimension = dimension
-        self.values: List[float] = []
-        self.timestamps: List[str] = []
+        self._reduce = self._AGGREGATIONS.get(aggregation, self._AGGREGATIONS["sum"])
+        self.values = array('d')  # contiguous float64 buffer
+        self.timestamps = array('d')  # epoch seconds, parallel to values
+        
+        # Running aggregates so compute() never rescans the buffer
+        self._sum = 0.0
+        self._min = float("inf")
+        self._max = float("-inf")
+        self._computed: Optional[Dict[str, Any]] = None  # memoized compute(), reset on write
     
-    def record_value(self, value: float, timestamp: str = None):
+    def record_value(self, value: float, timestamp: float = None):
         """Record metric value."""
-        timestamp = timestamp or datetime.now(timezone.utc).isoformat()
+        timestamp = timestamp if timestamp is not None else _now()
         self.values.append(value)
         self.timestamps.append(timestamp)
+        self._sum += value
+        if value < self._min:
+            self._min = value
+        if value > self._max:
+            self._max = value
+        self._computed = None
+    
+    def record_values(self, values: List[float], timestamp: float = None):
+        """Record a batch of values sharing one timestamp."""
+        if not values:
+            return
+        timestamp = timestamp if timestamp is not None else _now()
+        self.values.extend(values)
+        self.timestamps.extend(array('d', (timestamp,)) * len(values))
+        self._sum += sum(values)
+        self._min = min(self._min, min(values))
+        self._max = max(self._max, max(values))
+        self._computed = None
+    
+    @property
+    def total(self) -> float:
+        """Sum of all recorded values."""
+        return self._sum
     
     def compute(self) -> Dict[str, Any]:
         """Compute metric statistics."""
-        if not self.values:
-            return {"value": 0, "count": 0}
+        if self._computed is not None:
+            return self._computed
         
-        if self.aggregation == "sum":
-            result = sum(self.values)
-        elif self.aggregation == "count":
-            result = len(self.values)
-        elif self.aggregation == "avg":
-            result = sum(self.values) / len(self.values)
-        elif self.aggregation == "min":
-            result = min(self.values)
-        elif self.aggregation == "max":
-            result = max(self.values)
-        else:
-            result = sum(self.values)
+        count = len(self.values)
+        if not count:
+            return {"value": 0, "count": 0}
         
-        return {
-            "value": result,
-            "count": len(self.values),
-            "last_updated": self.timestamps[-1] if self.timestamps else None
+        self._computed = {
+            "value": self._reduce(self._sum, count, self._min, self._max),
+            "count": count,
+            "last_updated": _format_ts(self.timestamps[-1]) if self.timestamps else None
         }
+        return self._computed
 
 class BusinessIntelligenceEngine:
     """Advanced business intelligence and analytics engine."""
@@ -640,6 +1308,7 @@ class BusinessIntelligenceEngine:
         self.metrics[name] = metric
         return metric
     
+    @_time_scoped
     def record_business_event(self, event_type: str, value: float, dimensions: Dict[str, str] = None):
         """Record business event for analytics."""
         dimensions = dimensions or {}
@@ -656,6 +1325,23 @@ class BusinessIntelligenceEngine:
             
             self.metrics[dim_metric_name].record_value(value)
     
+    @_time_scoped
+    def record_business_events_batch(self, events: List[Tuple[str, float, Dict[str, str]]]):
+        """Record many (event_type, value, dimensions) events at once."""
+        # Group values per target metric, creating dimensional metrics in first-seen order
+        grouped: Dict[str, List[float]] = defaultdict(list)
+        for event_type, value, dimensions in events:
+            if event_type in self.metrics:
+                grouped[event_type].append(value)
+            for dim_key, dim_value in (dimensions or {}).items():
+                dim_metric_name = f"{event_type}_{dim_key}_{dim_value}"
+                if dim_metric_name not in self.metrics:
+                    self.metrics[dim_metric_name] = AnalyticsMetric(dim_metric_name, "sum", dim_key)
+                grouped[dim_metric_name].append(value)
+        
+        for metric_name, values in grouped.items():
+            self.metrics[metric_name].record_values(values)
+    
     def create_dashboard(self, dashboard_id: str, title: str, metrics: List[str]) -> Dict[str, Any]:
         """Create analytics dashboard."""
         dashboard = {
@@ -689,9 +1375,17 @@ class BusinessIntelligenceEngine:
     
     def update_kpis(self):
         """Update all KPI statuses."""
+        self._update_kpis_from_snapshot(self._metric_snapshot())
+    
+    def _metric_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Compute every metric once for sharing across a report."""
+        return {name: metric.compute() for name, metric in self.metrics.items()}
+    
+    def _update_kpis_from_snapshot(self, snapshot: Dict[str, Dict[str, Any]]):
+        """Update KPI statuses from precomputed metric results."""
         for kpi in self.kpis.values():
-            if kpi["metric_name"] in self.metrics:
-                metric_result = self.metrics[kpi["metric_name"]].compute()
+            metric_result = snapshot.get(kpi["metric_name"])
+            if metric_result is not None:
                 current_value = metric_result["value"]
                 
                 kpi["current_value"] = current_value
@@ -710,9 +1404,11 @@ class BusinessIntelligenceEngine:
                 kpi["achievement_percentage"] = min(achievement, 100)
                 kpi["status"] = status
     
+    @_time_scoped
     def generate_executive_report(self) -> Dict[str, Any]:
         """Generate executive summary report."""
-        self.update_kpis()
+        snapshot = self._metric_snapshot()
+        self._update_kpis_from_snapshot(snapshot)
         
         # KPI summary
         achieved_kpis = [kpi for kpi in self.kpis.values() if kpi["status"] == "achieved"]
@@ -720,7 +1416,7 @@ class BusinessIntelligenceEngine:
         
         # Business trends
         revenue_metrics = [m for name, m in self.metrics.items() if "revenue" in name.lower()]
-        total_revenue = sum(sum(m.values) for m in revenue_metrics)
+        total_revenue = sum(m.total for m in revenue_metrics)
         
         return {
             "executive_summary": {
@@ -732,12 +1428,16 @@ class BusinessIntelligenceEngine:
                 "total_revenue": total_revenue
             },
             "kpi_status": {kpi_id: kpi["status"] for kpi_id, kpi in self.kpis.items()},
-            "top_performing_metrics": sorted(
-                [(name, m.compute()["value"]) for name, m in self.metrics.items()],
-                key=lambda x: x[1], reverse=True
-            )[:5],
-            "generated_at": datetime.now(timezone.utc).isoformat()
+            "top_performing_metrics": heapq.nlargest(
+                5, ((name, result["value"]) for name, result in snapshot.items()),
+                key=lambda x: x[1]
+            ),
+            "generated_at": _format_ts(_now())
         }
+    
+    def report_bytes(self) -> bytes:
+        """Executive report serialized as JSON."""
+        return dumps_report(self.generate_executive_report())
 
 async def demonstrate_enterprise_features():
     """Demonstrate enterprise-grade event sourcing features."""
@@ -759,8 +1459,9 @@ async def demonstrate_enterprise_features():
     ]
     
     for principal_id, principal_type, roles, clearance in principals:
-        principal = security_mgr.create_principal(principal_id, principal_type, roles, clearance)
-        print(f"   ✓ Created principal: {principal_id} ({principal_type}) - {clearance.value}")
+        principal = security_mgr.create_principal(principal_id, principal_type, roles, clearance,
+                                                  password="secure_password_123")
+        print(f"   ✓ Created principal: {principal_id} ({principal_type}) - {clearance.label}")
         
         # Test authentication
         success = security_mgr.authenticate(principal_id, "secure_password_123", "192.168.1.100")
@@ -777,24 +1478,36 @@ async def demonstrate_enterprise_features():
     
     for resource, permission, required_level in test_resources:
         # Set access policy
-        security_mgr.access_policies[resource] = {"required_clearance": required_level.value}
+        security_mgr.set_access_policy(resource, required_level)
         
         for principal_id, _, _, _ in principals[:3]:  # Test first 3 principals
             authorized = security_mgr.authorize(principal_id, resource, permission)
             status = "✅" if authorized else "❌"
-            print(f"     {status} {principal_id} → {resource} ({permission.value})")
+            print(f"     {status} {principal_id} → {resource} ({permission.label})")
+    
+    # Burst of identical checks shares one policy evaluation
+    burst = await asyncio.gather(*(
+        security_mgr.authorize_async("regular_user", "customer_data", Permission.READ)
+        for _ in range(50)
+    ))
+    print(f"     ✅ {len(burst)} concurrent regular_user → customer_data (read) checks coalesced")
     
     # Track data access
     security_mgr.track_data_access("admin_user", "customer_records", 
                                  ["cust-1", "cust-2", "cust-3"], "read", 1024)
     
-    security_report = security_mgr.get_security_report()
+    security_report = await security_mgr.get_security_report_async()
     print(f"\n   📊 Security Report:")
     print(f"     Total security events: {security_report['total_events']}")
     print(f"     Successful logins: {security_report['successful_logins']}")
     print(f"     Failed logins: {security_report['failed_logins']}")
     print(f"     Active principals: {security_report['active_principals']}")
     
+    # Persist the audit trail; records become pydantic events only at this point
+    audit_trail = SecurityAuditTrail(id="security-audit-trail")
+    persisted = await security_mgr.flush_to_event_store(event_store, audit_trail)
+    print(f"     Persisted to event store: {persisted} events")
+    
     print("\n2. Compliance and regulatory management...")
     
     # Set up compliance manager
@@ -802,19 +1515,19 @@ async def demonstrate_enterprise_features():
     
     # Add data to inventory
     test_data = [
-        ("customer_email_1", DataClassification.PERSONAL, "customer_service"),
-        ("financial_report_2024", DataClassification.FINANCIAL, "finance_team"),
-        ("marketing_campaign", DataClassification.INTERNAL, "marketing_team"),
-        ("user_profile_123", DataClassification.PERSONAL, "product_team")
+        ("customer_email_1", DataClassification.PERSONAL, "customer_service", "user_456"),
+        ("financial_report_2024", DataClassification.FINANCIAL, "finance_team", None),
+        ("marketing_campaign", DataClassification.INTERNAL, "marketing_team", None),
+        ("user_profile_123", DataClassification.PERSONAL, "product_team", "user_123")
     ]
     
     # Add historical data (some overdue)
     historical_date = datetime.now(timezone.utc) - timedelta(days=800)  # Over 2 years old
     
-    for data_id, data_type, owner in test_data:
+    for data_id, data_type, owner, subject_id in test_data:
         # Some data is old to test retention compliance
         created_date = historical_date if "email" in data_id else None
-        compliance_mgr.add_data_to_inventory(data_id, data_type, owner, created_date)
+        compliance_mgr.add_data_to_inventory(data_id, data_type, owner, created_date, subject_id)
         print(f"   ✓ Added to inventory: {data_id} ({data_type.value})")
     
     # Check compliance violations
@@ -911,8 +1624,7 @@ async def demonstrate_enterprise_features():
         ("error_rate", 0.5, {"service": "payment"})
     ]
     
-    for event_type, value, dimensions in business_events:
-        bi_engine.record_business_event(event_type, value, dimensions)
+    bi_engine.record_business_events_batch(business_events)
     
     print(f"     Recorded {len(business_events)} business events")
     
@@ -960,7 +1672,7 @@ async def demonstrate_enterprise_features():
     enterprise_summary = {
         "security": {
             "principals": len(security_mgr.principals),
-            "security_events": len(security_mgr.security_events),
+            "security_events": security_report["total_events"],
             "policies": len(security_mgr.access_policies)
         },
         "compliance": {
@@ -987,6 +1699,9 @@ async def demonstrate_enterprise_features():
         for metric, value in stats.items():
             print(f"       - {metric.replace('_', ' ').title()}: {value}")
     
+    # Stop the audit writer thread off the event loop
+    await asyncio.get_running_loop().run_in_executor(None, security_mgr.close)
+    
     return {
         "security_manager": security_mgr,
         "compliance_manager": compliance_mgr,
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Example 16 Report Serialization Test
+
+Checks that the enterprise reports serialize to the same JSON bytes with and
+without orjson installed, so consumers of report_bytes() see one format.
+
+Run with: uv run python examples/16_report_bytes_test.py
+"""
+
+import json
+import sys
+import os
+import uuid
+from datetime import datetime, timezone, timedelta
+
+import importlib.util
+spec = importlib.util.spec_from_file_location("enterprise_features", os.path.join(os.path.dirname(__file__), "16_enterprise_features.py"))
+enterprise = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(enterprise)
+
+def build_reports():
+    """Generate each report once from a small populated setup."""
+    security_mgr = enterprise.SecurityManager()
+    try:
+        security_mgr.create_principal("admin_user", "user", {"admin"},
+                                      enterprise.SecurityLevel.RESTRICTED,
+                                      password="secure_password_123")
+        security_mgr.authenticate("admin_user", "secure_password_123", "192.168.1.100")
+        security_mgr.authenticate("admin_user", "wrong_password", "192.168.1.100")
+        security_mgr.set_access_policy("financial_data", enterprise.SecurityLevel.CONFIDENTIAL)
+        security_mgr.authorize("admin_user", "financial_data", enterprise.Permission.READ)
+        security_report = security_mgr.get_security_report()
+        security_bytes = security_mgr.report_bytes()
+    finally:
+        security_mgr.close()
+
+    compliance_mgr = enterprise.ComplianceManager()
+    compliance_mgr.add_data_to_inventory("customer_email_1", enterprise.DataClassification.PERSONAL,
+                                         "customer_service",
+                                         datetime.now(timezone.utc) - timedelta(days=800),
+                                         "user_456")
+    compliance_mgr.add_data_to_inventory("financial_report_2024", enterprise.DataClassification.FINANCIAL,
+                                         "finance_team", None, None)
+
+    bi_engine = enterprise.BusinessIntelligenceEngine()
+    bi_engine.define_metric("revenue", "sum")
+    bi_engine.define_metric("response_time", "avg")
+    bi_engine.record_business_events_batch([
+        ("revenue", 15000.0, {"region": "us"}),
+        ("revenue", 8500.5, {"region": "eu"}),
+        ("response_time", 150.0, {"endpoint": "api"})
+    ])
+    bi_engine.define_kpi("monthly_revenue", "Monthly Revenue Target", 50000.0, "revenue", "gte")
+
+    boundary_values = {
+        "naive": datetime(2024, 1, 2, 3, 4, 5),
+        "naive_micros": datetime(2024, 1, 2, 3, 4, 5, 123456),
+        "utc": datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+        "offset": datetime(2024, 1, 2, 3, 4, 5, 7, tzinfo=timezone(timedelta(hours=5, minutes=30))),
+        "negative_offset": datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone(timedelta(hours=-8))),
+        "standard": enterprise.ComplianceStandard.GDPR,
+        "level": enterprise.SecurityLevel.RESTRICTED,
+        "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "text": "Zürich → 東京",
+        "number_like_text": ["1e-05", "NaN", "x\\\"1e-07\\", "-Infinity"],
+        "floats": [0.1, 2.5, 1e-04, 1e-05, -4.8e-06, 1.6e-07, 7.2e-09, 3.9e-10, 1e16, 1e22, 5e-324],
+        "non_finite": [float("inf"), float("-inf"), float("nan")],
+        "nested": [(1, "a"), {"ok": True, "missing": None}]
+    }
+
+    return {
+        "security": security_report,
+        "compliance": compliance_mgr.generate_compliance_report(),
+        "executive": bi_engine.generate_executive_report(),
+        "boundary_values": boundary_values
+    }, security_bytes
+
+def main():
+    """Compare the orjson and json encodings of every report."""
+    print("🧪 Report Serialization Test")
+    print("=" * 60)
+
+    if enterprise.orjson is None:
+        print("⚠️  orjson is not installed; only the json path is available, nothing to compare")
+        return True
+
+    reports, security_bytes = build_reports()
+    json.loads(security_bytes)
+
+    orjson_module = enterprise.orjson
+    all_match = True
+    for name, report in reports.items():
+        fast = enterprise.dumps_report(report)
+        enterprise.orjson = None
+        try:
+            fallback = enterprise.dumps_report(report)
+        finally:
+            enterprise.orjson = orjson_module
+
+        if fast == fallback:
+            print(f"   ✅ {name}: {len(fast)} bytes, identical")
+        else:
+            print(f"   ❌ {name}: encodings differ")
+            print(f"      orjson: {fast!r}")
+            print(f"      json:   {fallback!r}")
+            all_match = False
+
+    return all_match
+
+if __name__ == "__main__":
+    success = main()
+    if success:
+        print(f"\n✅ Report serialization test PASSED!")
+        sys.exit(0)
+    else:
+        print(f"\n❌ Report serialization test FAILED!")
+        sys.exit(1)
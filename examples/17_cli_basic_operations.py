@@ -25,12 +25,19 @@ DEPRECATION WARNINGS:
 - TODO: Improve error messages with actionable suggestions
 """
 
+import atexit
+import hashlib
+import importlib.metadata
+import select
 import subprocess
 import sys
 import json
 import os
 import tempfile
-from typing import List, Tuple, Any, Optional
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Tuple, Any, Optional
 from pathlib import Path
 
 # Colored output for better visibility
@@ -64,6 +71,169 @@ def print_info(message: str):
     """Print info message."""
     print(f"{Colors.CYAN}ℹ️  {message}{Colors.END}")
 
+# Long-lived `eventuali.cli_server` process; commands are sent as JSON lines so
+# each one skips interpreter and `uv` environment start-up.
+_CLI_SERVER_CMD = ["uv", "run", "python", "-m", "eventuali.cli_server"]
+_CLI_PROC: Optional[subprocess.Popen] = None
+_CLI_SERVER_FAILED = False
+
+def _stop_cli_server():
+    """Terminate the CLI server process, if running."""
+    global _CLI_PROC
+    if _CLI_PROC is not None and _CLI_PROC.poll() is None:
+        _CLI_PROC.terminate()
+        try:
+            _CLI_PROC.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            _CLI_PROC.kill()
+    _CLI_PROC = None
+
+atexit.register(_stop_cli_server)
+
+def _get_cli_server() -> Optional[subprocess.Popen]:
+    """Return the running CLI server, starting it on first use."""
+    global _CLI_PROC, _CLI_SERVER_FAILED
+    if _CLI_PROC is not None and _CLI_PROC.poll() is None:
+        return _CLI_PROC
+    if _CLI_SERVER_FAILED:
+        return None
+    try:
+        _CLI_PROC = subprocess.Popen(
+            _CLI_SERVER_CMD,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+            cwd=os.getcwd()
+        )
+    except OSError:
+        _CLI_SERVER_FAILED = True
+        _CLI_PROC = None
+    return _CLI_PROC
+
+def _run_via_cli_server(cmd: List[str], timeout: int) -> Optional[Tuple[int, str, str]]:
+    """Run an `eventuali` command on the CLI server; None if the server is unavailable."""
+    global _CLI_SERVER_FAILED
+    if os.name != "posix":
+        # Replies are awaited with select(), which cannot wait on pipes off POSIX
+        return None
+    proc = _get_cli_server()
+    if proc is None:
+        return None
+    try:
+        proc.stdin.write(json.dumps({"argv": cmd[2:]}) + "\n")
+        proc.stdin.flush()
+    except (BrokenPipeError, OSError):
+        _CLI_SERVER_FAILED = True
+        _stop_cli_server()
+        return None
+
+    try:
+        ready, _, _ = select.select([proc.stdout], [], [], timeout)
+    except (OSError, ValueError):
+        _CLI_SERVER_FAILED = True
+        _stop_cli_server()
+        return None
+    if not ready:
+        # The server is stuck on this command; drop it so the next one starts clean.
+        _stop_cli_server()
+        raise subprocess.TimeoutExpired(cmd, timeout)
+
+    line = proc.stdout.readline()
+    if not line:
+        # Server exited (e.g. `uv` or the package is missing); use plain subprocesses.
+        _CLI_SERVER_FAILED = True
+        _stop_cli_server()
+        return None
+    try:
+        response = json.loads(line)
+        return response["rc"], response["stdout"], response["stderr"]
+    except (ValueError, KeyError):
+        _CLI_SERVER_FAILED = True
+        _stop_cli_server()
+        return None
+
+# Per-stream cap on captured output; only the most recent bytes are kept.
+_OUTPUT_BUFFER_BYTES = 64 * 1024
+
+def _append_bounded(buf: deque, chunk: bytes, size: List[int]):
+    """Append a chunk, dropping the oldest bytes beyond _OUTPUT_BUFFER_BYTES."""
+    buf.append(chunk)
+    size[0] += len(chunk)
+    while size[0] > _OUTPUT_BUFFER_BYTES:
+        excess = size[0] - _OUTPUT_BUFFER_BYTES
+        head = buf[0]
+        if len(head) <= excess:
+            buf.popleft()
+            size[0] -= len(head)
+        else:
+            buf[0] = head[excess:]
+            size[0] -= excess
+
+def _drain_with_select(proc: subprocess.Popen, buffers: Tuple[deque, deque], deadline: float) -> bool:
+    """Read both pipes with select until EOF (POSIX only); False if the deadline passes first."""
+    pipes = {proc.stdout.fileno(): buffers[0], proc.stderr.fileno(): buffers[1]}
+    sizes = {fd: [0] for fd in pipes}
+    open_fds = list(pipes)
+    for fd in open_fds:
+        os.set_blocking(fd, False)
+
+    try:
+        while open_fds:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            ready, _, _ = select.select(open_fds, [], [], remaining)
+            for fd in ready:
+                try:
+                    chunk = os.read(fd, 4096)
+                except BlockingIOError:
+                    continue
+                if chunk:
+                    _append_bounded(pipes[fd], chunk, sizes[fd])
+                else:
+                    open_fds.remove(fd)
+        return True
+    finally:
+        proc.stdout.close()
+        proc.stderr.close()
+
+def _drain_with_threads(proc: subprocess.Popen, buffers: Tuple[deque, deque], deadline: float) -> bool:
+    """Read each pipe on its own thread until EOF; False if the deadline passes first."""
+    def pump(pipe, buf: deque):
+        size = [0]
+        with pipe:
+            for chunk in iter(lambda: pipe.read1(4096), b""):
+                _append_bounded(buf, chunk, size)
+
+    readers = [threading.Thread(target=pump, args=(pipe, buf), daemon=True)
+               for pipe, buf in zip((proc.stdout, proc.stderr), buffers)]
+    for reader in readers:
+        reader.start()
+    for reader in readers:
+        reader.join(max(deadline - time.monotonic(), 0))
+    return not any(reader.is_alive() for reader in readers)
+
+def _run_subprocess(cmd: List[str], timeout: int) -> Tuple[int, str, str]:
+    """Run a command, streaming its output into bounded buffers; kill it on timeout."""
+    deadline = time.monotonic() + timeout
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=os.getcwd())
+    buffers = (deque(), deque())
+    # select() only accepts pipes on POSIX; elsewhere (Windows) each pipe gets a reader thread
+    drain = _drain_with_select if os.name == "posix" else _drain_with_threads
+
+    try:
+        if not drain(proc, buffers, deadline):
+            raise subprocess.TimeoutExpired(cmd, timeout)
+        returncode = proc.wait(timeout=max(deadline - time.monotonic(), 0))
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+        raise
+
+    stdout, stderr = (b"".join(buf).decode("utf-8", "replace") for buf in buffers)
+    return returncode, stdout, stderr
+
 def run_cli_command(cmd: List[str], capture_output: bool = True, timeout: int = 30) -> Tuple[bool, str, str]:
     """
     Run a CLI command and return success status and output.
@@ -76,20 +246,22 @@ def run_cli_command(cmd: List[str], capture_output: bool = True, timeout: int =
     try:
         print_info(f"Running: {' '.join(cmd)}")
         
-        result = subprocess.run(
-            cmd,
-            capture_output=capture_output,
-            text=True,
-            timeout=timeout,
-            cwd=os.getcwd()
-        )
-        
-        success = result.returncode == 0
+        if cmd[:3] == ["uv", "run", "eventuali"]:
+            served = _run_via_cli_server(cmd, timeout)
+            if served is not None:
+                returncode, stdout, stderr = served
+                if not capture_output:
+                    sys.stdout.write(stdout)
+                    sys.stderr.write(stderr)
+                    return returncode == 0, "", ""
+                return returncode == 0, stdout, stderr
         
         if not capture_output:
-            return success, "", ""
+            result = subprocess.run(cmd, timeout=timeout, cwd=os.getcwd())
+            return result.returncode == 0, "", ""
         
-        return success, result.stdout, result.stderr
+        returncode, stdout, stderr = _run_subprocess(cmd, timeout)
+        return returncode == 0, stdout, stderr
         
     except subprocess.TimeoutExpired:
         print_warning(f"Command timed out after {timeout} seconds")
@@ -98,13 +270,76 @@ def run_cli_command(cmd: List[str], capture_output: bool = True, timeout: int =
         print_error(f"Command execution failed: {e}")
         return False, "", str(e)
 
+# `--help` output is cached on disk, keyed by everything that can change it: the
+# eventuali package sources and pyproject.toml (`uv run` executes the workspace CLI),
+# uv.lock (click renders the help text), the installed package version and the
+# interpreter.
+_HELP_CACHE = Path.home() / ".eventuali" / "help_cache.json"
+
+_REPO_ROOT = Path(__file__).resolve().parent.parent
+_PACKAGE_DIR = _REPO_ROOT / "eventuali-python" / "python" / "eventuali"
+_HELP_SOURCES = [
+    _REPO_ROOT / "eventuali-python" / "pyproject.toml",
+    _REPO_ROOT / "uv.lock",
+]
+
+def _installed_version() -> str:
+    """Installed eventuali version, or a marker when it is not installed."""
+    try:
+        return importlib.metadata.version("eventuali")
+    except importlib.metadata.PackageNotFoundError:
+        return "not installed"
+
+def _help_cache_key() -> Optional[str]:
+    """Fingerprint of everything the help output depends on; None if a source cannot be read."""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in (sys.executable, sys.version, _installed_version()):
+        digest.update(part.encode() + b"\0")
+    try:
+        for source in sorted(_PACKAGE_DIR.rglob("*.py")) + _HELP_SOURCES:
+            data = source.read_bytes()
+            digest.update(f"{source.relative_to(_REPO_ROOT).as_posix()}\0{len(data)}\0".encode())
+            digest.update(data)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+def run_help_commands(cmds: List[List[str]]) -> Dict[str, Tuple[bool, str, str]]:
+    """Run help commands, reusing cached results while the installed CLI is unchanged."""
+    key = _help_cache_key()
+    if key is not None:
+        try:
+            cached = json.loads(_HELP_CACHE.read_text())
+            if cached.get("key") == key:
+                results = {name: tuple(result) for name, result in cached["results"].items()}
+                if all(" ".join(cmd) in results for cmd in cmds):
+                    print_info(f"Using cached help output from {_HELP_CACHE}")
+                    return results
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+
+    results = {" ".join(cmd): run_cli_command(cmd) for cmd in cmds}
+
+    # Failures may be transient (missing uv, timeouts), so only cache a clean run.
+    if key is not None and all(success for success, _, _ in results.values()):
+        try:
+            _HELP_CACHE.parent.mkdir(mode=0o700, exist_ok=True)
+            _HELP_CACHE.write_text(json.dumps({"key": key, "results": results}))
+        except OSError:
+            pass
+    return results
+
 def demonstrate_cli_help_system():
     """Demonstrate CLI help system and command discovery."""
     print_step("1. CLI Help System", 
               "Exploring available CLI commands and getting help information")
     
+    main_help = ["uv", "run", "eventuali", "--help"]
+    command_help = [["uv", "run", "eventuali", cmd, "--help"] for cmd in ["init", "config", "query"]]
+    help_results = run_help_commands([main_help] + command_help)
+    
     # Test main help
-    success, stdout, stderr = run_cli_command(["uv", "run", "eventuali", "--help"])
+    success, stdout, stderr = help_results[" ".join(main_help)]
     
     if success:
         print_success("Main CLI help loaded successfully")
@@ -128,8 +363,8 @@ def demonstrate_cli_help_system():
         print_info(f"Detected CLI commands: {', '.join(commands)}")
         
         # Test specific command help
-        for cmd in ["init", "config", "query"]:
-            success, _, _ = run_cli_command(["uv", "run", "eventuali", cmd, "--help"])
+        for cmd, help_cmd in zip(["init", "config", "query"], command_help):
+            success, _, _ = help_results[" ".join(help_cmd)]
             if success:
                 print_success(f"✓ Help for '{cmd}' command available")
             else: